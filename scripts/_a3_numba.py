@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""compute_a3_scores.py 의 대용량 이벤트용 Numba 커널 (NUMBA_MIN_EVENTS 이상일 때만 import)."""
+import numpy as np
+from numba import njit, prange
+
+@njit(parallel=True, fastmath=True, cache=True)
+def score_kernel(starts, days, rank, hl_days):
+    """store_id 순으로 정렬된 이벤트를 매장 단위로 병렬 집계 (감쇠 + 카운트를 한 번에)."""
+    n = starts.size - 1
+    score = np.zeros(n)
+    win1 = np.zeros(n, np.int64); win2 = np.zeros(n, np.int64)
+    r12_1 = np.zeros(n, np.int64); r12_2 = np.zeros(n, np.int64)
+    min_days = np.zeros(n, np.int64)
+    for s in prange(n):
+        sc = 0.0; w1 = 0; w2 = 0; rc1 = 0; rc2 = 0
+        lo = days[starts[s]]
+        for i in range(starts[s], starts[s+1]):
+            d = days[i]
+            w = 0.5 ** (d / hl_days)
+            if rank[i] == 1:
+                sc += 5.0 * w; w1 += 1
+                if d <= 365: rc1 += 1
+            else:
+                sc += w; w2 += 1
+                if d <= 365: rc2 += 1
+            if d < lo: lo = d
+        score[s] = sc; win1[s] = w1; win2[s] = w2
+        r12_1[s] = rc1; r12_2[s] = rc2; min_days[s] = lo
+    return score, win1, win2, r12_1, r12_2, min_days
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""스크레이퍼 공용: 응답 바이트 + HTTP 헤더 charset 으로 lxml HTML 파싱."""
+import codecs
+
+from lxml import html
+
+# Python 코덱 이름 → libxml2 가 받는 인코딩 이름
+_LIBXML_NAMES = {
+    "euc_kr": "EUC-KR",
+    "cp949": "CP949",
+    "utf-8": "UTF-8",
+    "iso8859-1": "ISO-8859-1",
+    "ascii": "ASCII",
+}
+
+
+def _parser_for(charset):
+    """헤더 charset 라벨을 정규화해 HTMLParser 를 만든다. 모르는 라벨이면 None (meta 선언을 따름)."""
+    if not charset:
+        return None
+    try:
+        name = codecs.lookup(charset).name
+    except LookupError:
+        return None
+    try:
+        return html.HTMLParser(encoding=_LIBXML_NAMES.get(name, name))
+    except LookupError:
+        return None
+
+
+def parse_html(body, charset=None):
+    """응답 바이트를 lxml 로 파싱. 헤더 charset 을 쓸 수 있으면 쓰고, 아니면 문서의 meta 선언을 따른다."""
+    return html.fromstring(body, parser=_parser_for(charset))
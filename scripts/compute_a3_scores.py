@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import argparse, json, csv
-from datetime import datetime, date
-from collections import defaultdict
+import argparse, csv
+from datetime import datetime, date, timedelta
+
+import numpy as np
+import orjson
 
 AVG_DAYS_PER_MONTH = 30.4375
+# 이벤트가 이보다 적으면 Numba JIT 컴파일(매 CI 실행마다 수 초)이 오히려 손해
+NUMBA_MIN_EVENTS = 1_000_000
+_ZERO_PROPS = {"win1":0,"win2":0,"score":0.0,"last_win_date":None,"recent12m_win1":0,"recent12m_win2":0}
+_ZERO_SUMMARY = {"win1":0,"win2":0,"a3_score":0.0,"last_win_date":"","recent12m_win1":0,"recent12m_win2":0}
 
 def parse_args():
     p = argparse.ArgumentParser(description="Compute A3 scores (event-wise half-life).")
@@ -19,54 +25,87 @@ def parse_args():
 def parse_date(s): return datetime.strptime(s.strip(), "%Y-%m-%d").date()
 
 def read_events_csv(path):
-    ev = defaultdict(list)
+    """이벤트 CSV → store_id 순으로 정렬된 컬럼 배열.
+    반환: (sids, starts, dates, ranks) — 매장 sids[s] 의 이벤트는 [starts[s], starts[s+1]) 구간."""
+    ev_sid, ev_date, ev_rank = [], [], []
     with open(path,"r",encoding="utf-8") as f:
         reader = csv.DictReader((row for row in f if not row.startswith("#")))
-        for i,row in enumerate(reader, start=2):
+        for row in reader:
             sid = (row.get("store_id") or "").strip()
-            if not sid: 
+            if not sid:
                 continue  # unmatched skip
-            d = parse_date(row["date"])
-            rank = int(row["rank"])
-            ev[sid].append((d, rank))
-    return ev
+            ev_sid.append(sid); ev_date.append(row["date"].strip()); ev_rank.append(int(row["rank"]))
+    sid_arr = np.array(ev_sid, dtype=str)
+    order = np.argsort(sid_arr, kind="stable")
+    sid_arr = sid_arr[order]
+    sids = np.unique(sid_arr)
+    starts = np.append(np.searchsorted(sid_arr, sids), len(sid_arr))
+    dates = np.array(ev_date, dtype="datetime64[D]")[order]  # ISO 날짜 일괄 변환 ("" → NaT)
+    ranks = np.array(ev_rank, dtype=np.int8)[order]
+    return sids, starts, dates, ranks
 
-def months_elapsed(d1: date, d0: date) -> float:
-    return (d1 - d0).days / AVG_DAYS_PER_MONTH
+def score_numpy(starts, days, rank, hl_days):
+    """score_kernel 과 같은 집계를 bincount 로 계산 (JIT 컴파일 비용 없음)."""
+    n = starts.size - 1
+    sid_idx = np.repeat(np.arange(n), np.diff(starts))
+    w = np.power(0.5, days / hl_days)
+    is1 = rank == 1
+    recent = days <= 365
+    score = np.bincount(sid_idx, weights=np.where(is1, 5.0, 1.0) * w, minlength=n)
+    win1 = np.bincount(sid_idx[is1], minlength=n)
+    win2 = np.bincount(sid_idx[~is1], minlength=n)
+    r12_1 = np.bincount(sid_idx[is1 & recent], minlength=n)
+    r12_2 = np.bincount(sid_idx[~is1 & recent], minlength=n)
+    min_days = np.minimum.reduceat(days, starts[:-1]) if n else np.zeros(0, np.int32)
+    return score, win1, win2, r12_1, r12_2, min_days
 
 def compute_scores(features, events, today, half_life_months):
+    sids, starts, dates, ranks = events
+    # 빈 날짜(NaT)는 read_events_csv 에서 그대로 넘어옴 — 여기서 한 번만 검사해 거부.
+    # (int 로 바꾸면 0일 = 오늘 당첨으로 계산되어 점수가 조용히 틀어짐)
+    nat = np.isnat(dates)
+    if nat.any():
+        bad = np.unique(np.repeat(sids, np.diff(starts))[nat]).tolist()
+        raise ValueError(f"{int(nat.sum())} event(s) without a valid date (store_id: {', '.join(bad[:5])})")
+    days = (np.datetime64(today, "D") - dates).astype(np.int32)
+    if days.size >= NUMBA_MIN_EVENTS:
+        from _a3_numba import score_kernel  # numba 는 대용량일 때만 import
+    else:
+        score_kernel = score_numpy
+    score, win1, win2, r12_1, r12_2, min_days = score_kernel(
+        starts, days, ranks, half_life_months * AVG_DAYS_PER_MONTH)
+    pos = {sid: i for i, sid in enumerate(sids.tolist())}
+
     out=[]
     for f in features:
         p=f["properties"]
         sid=p.get("store_id")
-        evs=events.get(sid,[])
-        score=0.0; win1=0; win2=0; last_date=None; r12_1=0; r12_2=0
-        for d,rank in evs:
-            weight = 0.5 ** (months_elapsed(today, d) / half_life_months)
-            base = 5 if rank==1 else 1
-            score += base * weight
-            if rank==1: win1 +=1
-            else: win2 +=1
-            if (today - d).days <= 365.25:
-                if rank==1: r12_1 +=1
-                else: r12_2 +=1
-            if (last_date is None) or (d > last_date): last_date = d
-        p["win1"]=win1; p["win2"]=win2; p["score"]=round(score,6)
-        p["last_win_date"]= last_date.isoformat() if last_date else None
-        p["recent12m_win1"]=r12_1; p["recent12m_win2"]=r12_2
-        out.append({"store_id":sid,"win1":win1,"win2":win2,"a3_score":round(score,6),
-                    "last_win_date": last_date.isoformat() if last_date else "",
-                    "recent12m_win1":r12_1,"recent12m_win2":r12_2})
+        i=pos.get(sid)
+        if i is None:
+            # 이벤트 없는 매장은 0 값만 채우고, store_id 없는 feature 는 요약에서도 제외
+            p.update(_ZERO_PROPS)
+            if sid:
+                out.append({"store_id":sid, **_ZERO_SUMMARY})
+            continue
+        sc=float(score[i]); w1=int(win1[i]); w2=int(win2[i])
+        last_date=(today - timedelta(days=int(min_days[i]))).isoformat()
+        rc1=int(r12_1[i]); rc2=int(r12_2[i])
+        p["win1"]=w1; p["win2"]=w2; p["score"]=round(sc,6)
+        p["last_win_date"]=last_date
+        p["recent12m_win1"]=rc1; p["recent12m_win2"]=rc2
+        out.append({"store_id":sid,"win1":w1,"win2":w2,"a3_score":round(sc,6),
+                    "last_win_date":last_date,
+                    "recent12m_win1":rc1,"recent12m_win2":rc2})
     return out
 
 def main():
     args=parse_args()
     today = parse_date(args.today) if args.today else date.today()
-    with open(args.geojson,"r",encoding="utf-8") as f: gj=json.load(f)
+    with open(args.geojson,"rb") as f: gj=orjson.loads(f.read())
     feats=gj.get("features",[])
     ev=read_events_csv(args.events)
     summary=compute_scores(feats, ev, today, args.half_life_months)
-    with open(args.out_geojson,"w",encoding="utf-8") as f: json.dump(gj,f,ensure_ascii=False)
+    with open(args.out_geojson,"wb") as f: f.write(orjson.dumps(gj, option=orjson.OPT_NON_STR_KEYS|orjson.OPT_SERIALIZE_NUMPY))
     with open(args.out_summary,"w",newline="",encoding="utf-8") as f:
         w=csv.DictWriter(f, fieldnames=list(summary[0].keys()) if summary else ["store_id","win1","win2","a3_score","last_win_date","recent12m_win1","recent12m_win2"])
         w.writeheader(); [w.writerow(r) for r in summary]
@@ -1,20 +1,55 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import os, time, csv, json, requests, urllib.parse
+import os, csv, time, random, asyncio
+import aiohttp
 
 API = "https://dapi.kakao.com/v2/local/search/address.json"
+CONCURRENCY = 16      # 동시 요청 수
+RATE_PER_SEC = 20.0   # 초당 요청 상한 (토큰 버킷)
+MAX_RETRIES = 4
 
-def geocode(addr, key):
-    url = f"{API}?query={urllib.parse.quote(addr)}"
-    r = requests.get(url, headers={"Authorization": f"KakaoAK {key}"}, timeout=10)
-    r.raise_for_status()
-    docs = r.json().get("documents", [])
-    if not docs: 
+class TokenBucket:
+    """초당 rate 개의 토큰을 채우는 단순 토큰 버킷. (capacity=1 이면 버스트 없이 균일 간격)"""
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+async def geocode(session, sem, bucket, addr, key):
+    headers = {"Authorization": f"KakaoAK {key}"}
+    for attempt in range(MAX_RETRIES + 1):
+        async with sem:
+            # 토큰은 슬롯을 잡은 뒤에 받아야 대기 중인 요청이 한꺼번에 몰리지 않음
+            await bucket.acquire()
+            async with session.get(API, params={"query": addr}, headers=headers) as r:
+                retry = r.status == 429 or r.status >= 500
+                if not retry or attempt == MAX_RETRIES:
+                    r.raise_for_status()
+                    docs = (await r.json()).get("documents", [])
+                    break
+                # Retry-After 가 있으면 따르고, 없으면 지수 백오프 + 지터
+                ra = r.headers.get("Retry-After", "")
+                delay = float(ra) if ra.isdigit() else 0.5 * 2 ** attempt
+        await asyncio.sleep(delay + random.uniform(0, 0.1))
+    if not docs:
         return "", ""
     d = docs[0]
     return d.get("y",""), d.get("x","")  # lat, lng
 
-def main():
+async def main():
     key = os.environ.get("KAKAO_API_KEY")
     if not key:
         raise SystemExit("KAKAO_API_KEY env missing")
@@ -28,19 +63,30 @@ def main():
         for row in r:
             rows.append(row)
 
-    out = []
-    for i, row in enumerate(rows, 1):
+    sem = asyncio.Semaphore(CONCURRENCY)
+    bucket = TokenBucket(RATE_PER_SEC)
+    done = 0
+
+    async def one(row):
+        nonlocal done
         addr = row.get("address","")
-        name = row.get("name","")
-        print(f"[GEO] {i}/{len(rows)} {name} {addr}")
-        lat, lng = "", ""
+        lat, lng = ("", "")
         if addr:
-            lat, lng = geocode(addr, key)
-            time.sleep(0.15)  # 속도 완화
+            lat, lng = await geocode(session, sem, bucket, addr, key)
+        done += 1
+        print(f"[GEO] {done}/{len(rows)} {row.get('name','')} {addr}")
+        return lat, lng
+
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=32), timeout=timeout) as session:
+        coords = await asyncio.gather(*[one(row) for row in rows])
+
+    out = []
+    for row, (lat, lng) in zip(rows, coords):
         out.append({
             "store_id": "",
-            "name": name,
-            "address": addr,
+            "name": row.get("name",""),
+            "address": row.get("address",""),
             "lat": lat,
             "lng": lng
         })
@@ -51,4 +97,4 @@ def main():
     print(f"[WRITE] {dst} rows={len(out)}")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-LoTTang 주간 스크레이퍼 (Requests + lxml)
+LoTTang 주간 스크레이퍼 (httpx + lxml)
 
 동작:
 1) 회차별 1/2등 판매점 표를 스크랩해 raw CSV(= dhlottery_stores.csv)에 누적
@@ -18,14 +18,18 @@ from __future__ import annotations
 import os
 import re
 import csv
-import json
+import random
+import asyncio
+import functools
 import subprocess
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Tuple
 
-import requests
-import pandas as pd
-from lxml import html  # cssselect 필요
+import httpx
+import ijson
+from lxml import etree
+
+from _htmlparse import parse_html
 
 # ---------------------- 대상 URL ----------------------
 BASE_URL = (
@@ -35,21 +39,23 @@ BASE_URL = (
 LOTTO_JSON = (
     "https://www.dhlottery.co.kr/common.do?method=getLottoNumber&drwNo={drwNo}"
 )
+FETCH_CONCURRENCY = 8  # 동시 수집 회차 수
+MAX_RETRIES = 3
+RETRY_STATUS = (429, 500, 502, 503, 504)
+STORES_COLUMNS = ["draw", "draw_date", "rank", "name", "choice_type", "address"]
+WINS_COLUMNS = ["store_id", "date", "rank", "draw_no", "name", "address"]
+
+# 고정 선택자는 미리 컴파일 (table.tbl_data 와 동일한 조건)
+_TABLES_XP = etree.XPath(
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' tbl_data ')]"
+)
+_CAPTION_XP = etree.XPath(".//caption//text()")
+_TH_XP = etree.XPath(".//th//text()")
+_TBODY_TR_XP = etree.XPath(".//tbody/tr")
+_TD_XP = etree.XPath("./td")
+_TEXT_XP = etree.XPath("string(.)")
 
 # ---------------------- 공용 유틸 ----------------------
-def get_draw_date(n: int) -> str:
-    """회차 → 추첨일(YYYY-MM-DD). 실패 시 빈 문자열."""
-    try:
-        r = requests.get(LOTTO_JSON.format(drwNo=n), timeout=10)
-        if r.ok:
-            d = r.json().get("drwNoDate")
-            if d:
-                return d
-    except Exception:
-        pass
-    return ""
-
-
 def _is_choice(s: str) -> bool:
     return any(x in s for x in ("자동", "수동", "반자동"))
 
@@ -100,23 +106,17 @@ def _guess_columns(tds: List[str]) -> Tuple[str, str, str] | None:
     return name, choice, addr
 
 
-def fetch_table(drw_no: int):
-    """한 회차 페이지에서 1/2등 표를 파싱해 (name, choice, addr, rank) 목록과 draw_date를 반환."""
-    url = BASE_URL.format(drwNo=drw_no)
-    r = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
-    r.raise_for_status()
-    doc = html.fromstring(r.text)
-
-    draw_date = get_draw_date(drw_no)
+def _parse_tables(doc) -> List[Tuple[str, str, str, int]]:
+    """파싱된 회차 페이지에서 1/2등 표의 (name, choice, addr, rank) 목록을 추출."""
     rows: List[Tuple[str, str, str, int]] = []
 
-    for t in doc.cssselect("table.tbl_data"):
+    for t in _TABLES_XP(doc):
         # 표 제목/헤더에서 1등/2등 힌트
-        head = " ".join(t.xpath(".//caption//text()") + t.xpath(".//th//text()"))
+        head = " ".join(_CAPTION_XP(t) + _TH_XP(t))
         rank_hint = 1 if "1등" in head else (2 if "2등" in head else 0)
 
-        for tr in t.xpath(".//tbody/tr"):
-            tds = ["".join(td.xpath(".//text()")).strip() for td in tr.xpath("./td")]
+        for tr in _TBODY_TR_XP(t):
+            tds = [_TEXT_XP(td).strip() for td in _TD_XP(tr)]
             if not tds:
                 continue
             guessed = _guess_columns(tds)
@@ -140,47 +140,119 @@ def fetch_table(drw_no: int):
 
             rows.append((name, choice, addr, rank))
 
-    return rows, draw_date
+    return rows
+
+
+async def _get(client: httpx.AsyncClient, url: str) -> httpx.Response:
+    """GET + 일시 오류(429/5xx, 연결 오류) 재시도. Retry-After 가 있으면 따르고, 없으면 지수 백오프."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            r = await client.get(url)
+        except httpx.TransportError:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = 0.5 * 2**attempt
+        else:
+            if r.status_code not in RETRY_STATUS or attempt == MAX_RETRIES:
+                return r
+            ra = r.headers.get("Retry-After", "")
+            delay = float(ra) if ra.isdigit() else 0.5 * 2**attempt
+        await asyncio.sleep(delay + random.uniform(0, 0.1))
+
+
+async def get_draw_date_async(client: httpx.AsyncClient, n: int) -> str:
+    """회차 → 추첨일(YYYY-MM-DD). 실패 시 빈 문자열."""
+    try:
+        r = await _get(client, LOTTO_JSON.format(drwNo=n))
+        if r.is_success:
+            d = r.json().get("drwNoDate")
+            if d:
+                return d
+    except Exception:
+        pass
+    return ""
+
+
+async def fetch_table_async(
+    client: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    drw_no: int,
+):
+    """한 회차 페이지에서 1/2등 표를 파싱해 (name, choice, addr, rank) 목록과 draw_date를 반환.
+    회차 페이지와 추첨일 JSON 을 동시에 요청한다."""
+
+    async def page():
+        r = await _get(client, BASE_URL.format(drwNo=drw_no))
+        r.raise_for_status()
+        return parse_html(r.content, r.charset_encoding)
+
+    async with sem:
+        doc, draw_date = await asyncio.gather(
+            page(), get_draw_date_async(client, drw_no)
+        )
+    return _parse_tables(doc), draw_date
+
+
+async def fetch_tables(draws: List[int]):
+    """여러 회차를 동시에 수집. 결과는 draws 순서를 따른다.
+    HTTP/2 클라이언트 하나를 공유해 같은 호스트 요청이 한 연결에서 다중화된다."""
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    async with httpx.AsyncClient(
+        http2=True,
+        headers={"User-Agent": "Mozilla/5.0"},
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        timeout=15,
+    ) as client:
+        return await asyncio.gather(
+            *[fetch_table_async(client, sem, d) for d in draws]
+        )
+
 
+_WS_RE = re.compile(r"\s+")
+_PAREN_RE = re.compile(r"\(.*?\)")
+_TOKENS = ("복권방", "복권", "로또", "편의점", "CU", "GS25", "세븐일레븐", "미니스톱")
+_DASH = str.maketrans("", "", "-")
 
+
+@functools.lru_cache(maxsize=200_000)
 def norm(s: str) -> str:
-    """매칭을 위한 문자열 정규화."""
+    """매칭을 위한 문자열 정규화. (같은 상호/주소가 회차마다 반복되므로 캐시)"""
     s = (s or "").strip()
-    s = re.sub(r"\s+", "", s)  # 모든 공백 제거
-    s = re.sub(r"\(.*?\)", "", s)  # 괄호 설명 제거
-    for tok in ["복권방", "복권", "로또", "편의점", "CU", "GS25", "세븐일레븐", "미니스톱"]:
+    s = _WS_RE.sub("", s)  # 모든 공백 제거
+    s = _PAREN_RE.sub("", s)  # 괄호 설명 제거
+    for tok in _TOKENS:
         s = s.replace(tok, "")
-    s = s.replace("-", "")
-    return s
-
-
-def build_index(geojson_path: str) -> Dict[str, str]:
-    """마스터 GeoJSON → (정규화된 name|address -> store_id) 인덱스."""
-    with open(geojson_path, "r", encoding="utf-8") as f:
-        gj = json.load(f)
-    idx: Dict[str, str] = {}
-    for ft in gj.get("features", []):
-        p = ft.get("properties", {}) or {}
-        key = norm(p.get("name", "")) + "|" + norm(p.get("address", ""))
-        if key and p.get("store_id"):
-            idx[key] = p["store_id"]
+    return s.translate(_DASH)
+
+
+def build_index(geojson_path: str) -> Dict[Tuple[str, str], str]:
+    """마스터 GeoJSON → ((정규화된 name, address) -> store_id) 인덱스."""
+    idx: Dict[Tuple[str, str], str] = {}
+    # properties 만 필요하므로 전체를 메모리에 올리지 않고 feature 단위로 스트리밍
+    with open(geojson_path, "rb") as f:
+        for ft in ijson.items(f, "features.item"):
+            p = ft.get("properties", {}) or {}
+            key = (norm(p.get("name", "")), norm(p.get("address", "")))
+            if p.get("store_id"):
+                idx[key] = p["store_id"]
     return idx
 
 
-def load_aliases(path: str) -> Dict[str, str]:
+def load_aliases(path: str) -> Dict[Tuple[str, str], str]:
     """
     (선택) 수동 매핑 파일: data/store_aliases.csv
     헤더: alias_name,alias_address,store_id
     """
-    m: Dict[str, str] = {}
+    m: Dict[Tuple[str, str], str] = {}
     if os.path.exists(path):
         with open(path, "r", encoding="utf-8") as f:
             r = csv.DictReader(f)
             for row in r:
-                key = norm(row.get("alias_name", "")) + "|" + norm(
-                    row.get("alias_address", "")
+                key = (
+                    norm(row.get("alias_name", "")),
+                    norm(row.get("alias_address", "")),
                 )
-                if key and row.get("store_id"):
+                if row.get("store_id"):
                     m[key] = row["store_id"]
     return m
 
@@ -195,21 +267,26 @@ def main(repo_root: str, base_draw: int, base_date: str):
     est = base_draw + ((today - base_d).days // 7)  # 오늘 기준 예상 최신 회차
 
     stores_csv = os.path.join(data_dir, "dhlottery_stores.csv")
-    if os.path.exists(stores_csv):
-        df = pd.read_csv(stores_csv)
-    else:
-        df = pd.DataFrame(
-            columns=["draw", "draw_date", "rank", "name", "choice_type", "address"]
-        )
-
-    have = set(df["draw"].unique().tolist()) if not df.empty else set()
+    fresh = not os.path.exists(stores_csv) or os.path.getsize(stores_csv) == 0
+    have = set()
+    if not fresh:
+        with open(stores_csv, "r", newline="", encoding="utf-8") as f:
+            have = {int(r["draw"]) for r in csv.DictReader(f)}
     # 기존에 없는 회차만 추가 수집 (처음엔 최신 1회차만)
     to_fetch = [d for d in range(min(have | {est}), est + 1) if d not in have] if have else [est]
 
     all_rows: List[Dict[str, str | int]] = []
-    for drw in to_fetch:
-        print(f"[SCRAPE] {drw}")
-        rows, dd = fetch_table(drw)
+    results = []
+    if to_fetch:
+        print(f"[SCRAPE] {to_fetch[0]}..{to_fetch[-1]} ({len(to_fetch)} draws)")
+        results = asyncio.run(fetch_tables(to_fetch))
+    else:
+        print(f"[SCRAPE] up to date (latest draw {est})")
+    for drw, (rows, dd) in zip(to_fetch, results):
+        if not dd:
+            # 추첨일 조회 실패 시 주 1회 추첨 규칙으로 계산 (빈 날짜가 CSV 에 남지 않도록)
+            dd = (base_d + timedelta(days=7 * (drw - base_draw))).isoformat()
+            print(f"[SCRAPE] {drw}: draw date lookup failed, using {dd}")
         for name, choice, addr, rank in rows:
             all_rows.append(
                 {
@@ -222,12 +299,14 @@ def main(repo_root: str, base_draw: int, base_date: str):
                 }
             )
 
-    if all_rows:
-        df = pd.concat([df, pd.DataFrame(all_rows)], ignore_index=True)
-
-    df.sort_values(["draw", "rank", "name"], inplace=True)
-    df.to_csv(stores_csv, index=False, encoding="utf-8")
-    print(f"[SAVE] {stores_csv} ({len(df)} rows)")
+    # 기존 이력은 다시 쓰지 않고 새 회차만 이어 붙임 (정렬은 읽는 쪽에서)
+    all_rows.sort(key=lambda r: (r["draw"], r["rank"], r["name"]))
+    with open(stores_csv, "a", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=STORES_COLUMNS, lineterminator="\n")
+        if fresh:
+            w.writeheader()
+        w.writerows(all_rows)
+    print(f"[SAVE] {stores_csv} (+{len(all_rows)} rows)")
 
     # ----- 매칭: GeoJSON + (옵션) alias -----
     geo = os.path.join(data_dir, "stores_clean.geojson")
@@ -237,29 +316,41 @@ def main(repo_root: str, base_draw: int, base_date: str):
     if os.path.exists(geo):
         idx = build_index(geo)
         alias = load_aliases(os.path.join(data_dir, "store_aliases.csv"))
-        W: List[Dict[str, str | int]] = []
-        U: List[Dict[str, str | int]] = []
-
-        for _, r in df.iterrows():
-            key = norm(str(r["name"])) + "|" + norm(str(r["address"]))
-            sid = alias.get(key) or idx.get(key, "")
-            row = {
-                "store_id": sid,
-                "date": r["draw_date"],
-                "rank": int(r["rank"]),
-                "draw_no": int(r["draw"]),
-                "name": r["name"],
-                "address": r["address"],
-            }
-            (W if sid else U).append(row)
-
-        pd.DataFrame(W).to_csv(wins, index=False, encoding="utf-8")
-        pd.DataFrame(U).to_csv(um, index=False, encoding="utf-8")
-        print(f"[SAVE] {wins} ({len(W)} rows), {um} ({len(U)} rows)")
+        with open(stores_csv, "r", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        rows.sort(key=lambda r: (int(r["draw"]), int(r["rank"]), r["name"]))
+
+        # 매칭/미매칭 파일에 바로 기록
+        n_w = n_u = 0
+        with open(wins, "w", newline="", encoding="utf-8") as fw, open(
+            um, "w", newline="", encoding="utf-8"
+        ) as fu:
+            ww = csv.writer(fw, lineterminator="\n")
+            wu = csv.writer(fu, lineterminator="\n")
+            ww.writerow(WINS_COLUMNS)
+            wu.writerow(WINS_COLUMNS)
+            for r in rows:
+                key = (norm(r["name"]), norm(r["address"]))
+                sid = alias.get(key) or idx.get(key, "")
+                row = (
+                    sid,
+                    r["draw_date"],
+                    int(r["rank"]),
+                    int(r["draw"]),
+                    r["name"],
+                    r["address"],
+                )
+                if sid:
+                    ww.writerow(row)
+                    n_w += 1
+                else:
+                    wu.writerow(row)
+                    n_u += 1
+        print(f"[SAVE] {wins} ({n_w} rows), {um} ({n_u} rows)")
 
         # ----- A3 산출 (선택) -----
         a3_script = os.path.join(repo_root, "scripts", "compute_a3_scores.py")
-        if W and os.path.exists(a3_script):
+        if n_w and os.path.exists(a3_script):
             out_geo = os.path.join(data_dir, "stores_clean.a3.geojson")
             out_sum = os.path.join(data_dir, "scores_a3_summary.csv")
             subprocess.check_call(
@@ -1,34 +1,62 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import csv, time, re, requests
-from lxml import html
+import csv, time, re, random, asyncio
+import aiohttp
+from lxml import etree
+
+from _htmlparse import parse_html
 
 BASE = "https://www.dhlottery.co.kr/store.do?method=sellerInfo645"
+WINDOW = 20        # 한 번에 미리 받아올 페이지 수
+CONCURRENCY = 10   # 동시 요청 수
+RATE_PER_SEC = 5   # 초당 요청 시작 수 (과한 요청 방지)
+MAX_PAGE = 2000    # 안전브레이크
+MAX_RETRIES = 3
+
+# 판매점 표 선택자(사이트 변경 시 아래를 조정) — "table.tbl_data tbody tr" 와 동일
+_ROWS_XP = etree.XPath(
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' tbl_data ')]//tbody//tr"
+)
+_TD_XP = etree.XPath("./td")
+_TEXT_XP = etree.XPath("string(.)")
+_WS_RE = re.compile(r"\s+")
+_PHONE_RE = re.compile(r"\d{2,4}-\d{3,4}-\d{3,4}")
+_NUM_RE = re.compile(r"\d+")
+
+class Throttle:
+    """요청 시작 간격을 1/rate 초 이상으로 유지."""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_at = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
 
 def clean(s): 
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return _WS_RE.sub(" ", (s or "").strip())
 
-def parse_page(page:int):
-    # 페이지 파라미터: nowPage=숫자 (기본 리스트)
-    url = f"{BASE}&nowPage={page}"
-    r = requests.get(url, timeout=15, headers={"User-Agent":"Mozilla/5.0"})
-    r.raise_for_status()
-    doc = html.fromstring(r.text)
+def parse_page(content:bytes, charset=None):
+    doc = parse_html(content, charset)
     rows = []
-    # 판매점 표 선택자(사이트 변경 시 아래를 조정)
-    for tr in doc.cssselect("table.tbl_data tbody tr"):
-        tds = ["".join(td.xpath(".//text()")) for td in tr.xpath("./td")]
-        tds = [clean(x) for x in tds if clean(x)]
+    for tr in _ROWS_XP(doc):
+        tds = [_TEXT_XP(td) for td in _TD_XP(tr)]
+        tds = [c for c in (clean(x) for x in tds) if c]
         if len(tds) < 3: 
             continue
         # 보통: [번호, 상호, 전화, 주소] 혹은 [번호, 상호, 주소, 전화]
         # 전화번호 패턴으로 위치 판정
-        phone_idx = next((i for i,x in enumerate(tds) if re.search(r"\d{2,4}-\d{3,4}-\d{3,4}", x)), -1)
+        phone_idx = next((i for i,x in enumerate(tds) if _PHONE_RE.search(x)), -1)
         if phone_idx == -1:
             # 전화 미기재일 수도 있음 → 빈 값
             phone = ""
             # 번호 칸 제거
-            cells = tds[1:] if re.fullmatch(r"\d+", tds[0]) else tds
+            cells = tds[1:] if _NUM_RE.fullmatch(tds[0]) else tds
             if len(cells)>=2:
                 name, addr = cells[0], cells[-1]
             else:
@@ -37,7 +65,7 @@ def parse_page(page:int):
             phone = tds[phone_idx]
             cells = [x for i,x in enumerate(tds) if i != phone_idx]
             # 번호 칸 제거
-            if cells and re.fullmatch(r"\d+", cells[0]):
+            if cells and _NUM_RE.fullmatch(cells[0]):
                 cells = cells[1:]
             if len(cells)>=2:
                 name, addr = cells[0], cells[-1]
@@ -49,27 +77,52 @@ def parse_page(page:int):
         })
     return rows
 
+async def fetch(session, sem, throttle, page:int):
+    # 페이지 파라미터: nowPage=숫자 (기본 리스트)
+    for attempt in range(MAX_RETRIES + 1):
+        async with sem:
+            await throttle.wait()
+            async with session.get(f"{BASE}&nowPage={page}") as r:
+                retry = r.status == 429 or r.status >= 500
+                if not retry or attempt == MAX_RETRIES:
+                    r.raise_for_status()
+                    content, charset = await r.read(), r.charset
+                    break
+                # Retry-After 가 있으면 따르고, 없으면 지수 백오프 + 지터
+                ra = r.headers.get("Retry-After", "")
+                delay = float(ra) if ra.isdigit() else 0.5 * 2 ** attempt
+        await asyncio.sleep(delay + random.uniform(0, 0.1))
+    return page, parse_page(content, charset)
+
+async def crawl():
+    seen = set(); dedup = []
+    sem = asyncio.Semaphore(CONCURRENCY)
+    throttle = Throttle(RATE_PER_SEC)
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=20),
+        headers={"User-Agent":"Mozilla/5.0"},
+        timeout=aiohttp.ClientTimeout(total=15),
+    ) as session:
+        page = 1
+        while page <= MAX_PAGE:
+            window = range(page, min(page + WINDOW, MAX_PAGE + 1))
+            print(f"[SELLERS] pages {window[0]}-{window[-1]}")
+            results = await asyncio.gather(*[fetch(session, sem, throttle, p) for p in window])
+            # 페이지 순서대로 붙이다가 빈 페이지를 만나면 종료 (중복은 바로 제거)
+            for _, rows in results:
+                if not rows:
+                    return dedup
+                for r in rows:
+                    key = (r["name"], r["address"])
+                    if key in seen:
+                        continue
+                    seen.add(key); dedup.append(r)
+            page += WINDOW
+    return dedup
+
 def main():
     out = "data/sellers_master.csv"
-    all_rows = []
-    page = 1
-    while True:
-        print(f"[SELLERS] page {page}")
-        rows = parse_page(page)
-        if not rows:
-            break
-        all_rows.extend(rows)
-        page += 1
-        time.sleep(0.4)  # 과한 요청 방지
-        if page > 2000:  # 안전브레이크
-            break
-    # 중복 제거
-    seen = set(); dedup=[]
-    for r in all_rows:
-        key = (r["name"], r["address"])
-        if key in seen: 
-            continue
-        seen.add(key); dedup.append(r)
+    dedup = asyncio.run(crawl())
     # 저장
     with open(out, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=["name","phone","address"])